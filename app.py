@@ -5,6 +5,8 @@ from datetime import datetime
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
+from precios import snapshot_id, guardar_snapshot, calcular_impresion
+from registros import TablaRegistros
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(
@@ -39,6 +41,8 @@ def load_config():
 def save_config(data):
     with open(CONFIG_FILE, "w") as f:
         json.dump(data, f, indent=4)
+    # Versionamos la lista de precios para poder re-cotizar el historial
+    return guardar_snapshot(data)
 
 def subir_a_drive(datos):
     """Sube una lista de datos a Google Sheets (Compatible Local y Nube)"""
@@ -82,6 +86,8 @@ def subir_a_drive(datos):
 config_data = load_config()
 precios_materiales = config_data.get("materiales", DEFAULT_PRECIO_MATERIAL)
 params_config = config_data.get("configuracion", DEFAULT_CONFIG)
+lista_actual = {"materiales": precios_materiales, "configuracion": params_config}
+snapshot_actual = snapshot_id(lista_actual)
 
 st.title("🖨️ Cotizador 3D Pro - Web")
 
@@ -148,17 +154,9 @@ with tab1:
                 total_horas = valor_tiempo / 60
                 txt_tiempo = f"{valor_tiempo} min"
             
-            precio_k = precios_materiales[material]
-            costo_mat = (peso * (1 + margen_error/100) / 1000) * precio_k
-            costo_luz = total_horas * params_config["consumo_kw"] * params_config["precio_kwh"]
-            costo_maq = total_horas * params_config["precio_desgaste_hora"]
-            
-            subtotal = costo_mat + costo_luz + costo_maq
-            precio_venta = subtotal * (1 + params_config["margen_ganancia"]/100)
-            costo_diseno_total = hs_diseno * params_config["precio_hora_diseno"]
-            
-            total_lote = precio_venta + costo_diseno_total
-            unitario = total_lote / cantidad
+            costo_mat, costo_luz, costo_maq, unitario, total_lote = calcular_impresion(
+                lista_actual, material, peso, total_horas, cantidad, hs_diseno, margen_error
+            )
 
             # Mostrar Resultados
             st.success("✅ Cálculo Exitoso")
@@ -177,14 +175,16 @@ with tab1:
                 datetime.now().strftime("%H:%M:%S"),
                 responsable,
                 cliente, modelo, "Impresión 3D", material, color,
-                peso, txt_tiempo, cantidad, hs_diseno, unitario, total_lote
+                peso, txt_tiempo, cantidad, hs_diseno, unitario, total_lote,
+                snapshot_actual, margen_error
             ]
             
+            guardar_snapshot(lista_actual) # La lista referenciada por el registro queda en disco
             with st.spinner("Guardando en la nube..."):
                 if subir_a_drive(datos):
                     st.toast("Guardado en Google Sheets con éxito!", icon="☁️")
-                    if 'historial' not in st.session_state: st.session_state.historial = []
-                    st.session_state.historial.append(datos)
+                    if 'historial' not in st.session_state: st.session_state.historial = TablaRegistros()
+                    st.session_state.historial.agregar_fila(datos)
 
 # ================= TAB 2: LLAVEROS =================
 with tab2:
@@ -207,21 +207,23 @@ with tab2:
                 datetime.now().strftime("%H:%M:%S"),
                 responsable,
                 cli_llav, mod_llav, "Venta Directa", "-", "-",
-                0, "N/A", cant_llav, 0, prec_llav, total_llav
+                0, "N/A", cant_llav, 0, prec_llav, total_llav,
+                snapshot_actual, 0
             ]
             
+            guardar_snapshot(lista_actual)
             with st.spinner("Guardando en la nube..."):
                 if subir_a_drive(datos):
                     st.toast("Venta registrada en Drive!", icon="☁️")
-                    if 'historial' not in st.session_state: st.session_state.historial = []
-                    st.session_state.historial.append(datos)
+                    if 'historial' not in st.session_state: st.session_state.historial = TablaRegistros()
+                    st.session_state.historial.agregar_fila(datos)
 
 # ================= TAB 3: HISTORIAL =================
 with tab3:
     st.write("📋 Historial de esta sesión:")
-    if 'historial' in st.session_state and st.session_state.historial:
-        headers = ["Fecha", "Hora", "Resp.", "Cliente", "Modelo", "Tipo", "Mat", "Color", "Peso", "Tiempo", "Cant", "Hs Dis", "Unitario", "Total"]
-        df = pd.DataFrame(st.session_state.historial, columns=headers)
+    if 'historial' in st.session_state and len(st.session_state.historial):
+        headers = ["Fecha", "Hora", "Resp.", "Cliente", "Modelo", "Tipo", "Mat", "Color", "Peso", "Tiempo", "Cant", "Hs Dis", "Unitario", "Total", "Lista", "Fallo %"]
+        df = pd.DataFrame(st.session_state.historial.a_filas(), columns=headers)
         st.dataframe(df)
     else:
         st.info("Aún no has realizado cálculos en esta sesión.")
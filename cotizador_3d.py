@@ -16,6 +16,9 @@ from PyQt6.QtCore import Qt
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
+from precios import guardar_snapshot, calcular_impresion
+from registros import TablaRegistros, formato_pesos
+
 # Intentar importar tema oscuro
 try:
     import qdarktheme
@@ -227,6 +230,7 @@ class CotizadorPro(QWidget):
     # ================= PESTAÑA 3: HISTORIAL =================
     def initTabHistorial(self):
         layout = QVBoxLayout()
+        self.historial = TablaRegistros()
         self.tabla = QTableWidget()
         # Definimos las columnas exactas
         headers = ["Fecha", "Resp.", "Cliente", "Modelo", "Tipo", "Mat", "Color", "Peso", "Tiempo", "Cant", "Unitario", "Total"]
@@ -240,12 +244,13 @@ class CotizadorPro(QWidget):
         row = self.tabla.rowCount()
         self.tabla.insertRow(row)
         # d = lista de datos. Mapeamos a las columnas
-        # Indices: 0:Fecha, 1:Hora, 2:Resp, 3:Cli, 4:Mod, 5:Tipo, 6:Mat, 7:Col, 8:Peso, 9:Tiempo, 10:Cant, 11:HsDis, 12:Unit, 13:Total
-        mapping = [0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 13] # Saltamos Hora y HsDiseno para la tabla visual
-        
-        for i, data_idx in enumerate(mapping):
-            val = str(d[data_idx])
-            if data_idx in [12, 13]: val = f"${float(d[data_idx]):.2f}"
+        # Indices: 0:Fecha, 1:Hora, 2:Resp, 3:Cli, 4:Mod, 5:Tipo, 6:Mat, 7:Col, 8:Peso, 9:Tiempo, 10:Cant, 11:HsDis, 12:Unit, 13:Total, 14:Snapshot, 15:Fallo%
+        mapping = [0, 2, 3, 4, 5, 6, 7, 8, 9, 10] # Saltamos Hora y HsDiseno para la tabla visual
+        reg = self.historial.agregar_fila(d)
+
+        valores = [str(d[data_idx]) for data_idx in mapping]
+        valores += [formato_pesos(reg.unitario_cent), formato_pesos(reg.total_cent)] # Montos en centavos enteros
+        for i, val in enumerate(valores):
             self.tabla.setItem(row, i, QTableWidgetItem(val))
 
     # ================= PESTAÑA 4: CONFIGURACIÓN =================
@@ -307,17 +312,10 @@ class CotizadorPro(QWidget):
             hs_dis = self.spin_hs_diseno.value() if self.chk_diseno.isChecked() else 0
 
             # 2. Costos
-            precio_k = self.precio_material[mat]
-            costo_mat = (peso * (1 + self.spin_margen_error.value()/100) / 1000) * precio_k
-            costo_luz = total_horas_imp * self.configuracion["consumo_kw"] * self.configuracion["precio_kwh"]
-            costo_maq = total_horas_imp * self.configuracion["precio_desgaste_hora"]
-            
-            subtotal = costo_mat + costo_luz + costo_maq
-            precio_venta = subtotal * (1 + self.configuracion["margen_ganancia"]/100)
-            costo_diseno = hs_dis * self.configuracion["precio_hora_diseno"]
-            
-            total_lote = precio_venta + costo_diseno
-            unitario = total_lote / cant
+            costo_mat, costo_luz, costo_maq, unitario, total_lote = calcular_impresion(
+                {"materiales": self.precio_material, "configuracion": self.configuracion},
+                mat, peso, total_horas_imp, cant, hs_dis, self.spin_margen_error.value()
+            )
 
             # 3. Reporte
             msg = (f"✅ IMPRESIÓN 3D | {mod}\n"
@@ -333,7 +331,8 @@ class CotizadorPro(QWidget):
                 datetime.now().strftime("%H:%M:%S"), # 1
                 self.combo_responsable.currentText(), # 2
                 cli, mod, "Impresión 3D", mat, col, # 3,4,5,6,7
-                peso, texto_tiempo, cant, hs_dis, unitario, total_lote # 8,9,10,11,12,13
+                peso, texto_tiempo, cant, hs_dis, unitario, total_lote, # 8,9,10,11,12,13
+                None, self.spin_margen_error.value() # 14 (lo completa procesarGuardado), 15
             ]
             self.procesarGuardado(datos)
 
@@ -368,7 +367,8 @@ class CotizadorPro(QWidget):
                 datetime.now().strftime("%H:%M:%S"), # 1
                 self.combo_responsable.currentText(), # 2
                 cli, mod, "Venta Directa", "-", "-", # 3,4,5,6,7
-                0, "N/A", cant, 0, unitario, total # 8,9,10,11,12,13
+                0, "N/A", cant, 0, unitario, total, # 8,9,10,11,12,13
+                None, 0 # 14 (lo completa procesarGuardado), 15
             ]
             self.procesarGuardado(datos)
 
@@ -377,6 +377,8 @@ class CotizadorPro(QWidget):
 
     # --- GUARDADO UNIFICADO ---
     def procesarGuardado(self, datos):
+        # 14: lista de precios con la que se cotizó el registro (queda guardada en disco)
+        datos[14] = guardar_snapshot({"materiales": self.precio_material, "configuracion": self.configuracion})
         self.agregarFilaHistorial(datos)
         self.subirADrive(datos)
         QMessageBox.information(self, "Guardado", "Registro añadido con éxito.")
@@ -395,20 +397,28 @@ class CotizadorPro(QWidget):
 
     # ================= UTILIDADES =================
     def guardarConfig(self):
+        # Se arma la lista nueva aparte: si algún número es inválido no se toca la vigente
+        materiales = dict(self.precio_material)
         for mat, inp in self.inputs_materiales.items():
-            try: self.precio_material[mat] = float(inp.text())
+            try: materiales[mat] = float(inp.text())
             except: pass
         
         try:
-            self.configuracion["precio_kwh"] = float(self.input_kwh.text())
-            self.configuracion["consumo_kw"] = float(self.input_consumo.text())
-            self.configuracion["margen_ganancia"] = float(self.input_ganancia.text())
-            
-            with open(CONFIG_FILE, "w") as f:
-                json.dump({"materiales": self.precio_material, "configuracion": self.configuracion}, f, indent=4)
-            QMessageBox.information(self, "Éxito", "Configuración guardada.")
+            configuracion = dict(self.configuracion)
+            configuracion["precio_kwh"] = float(self.input_kwh.text())
+            configuracion["consumo_kw"] = float(self.input_consumo.text())
+            configuracion["margen_ganancia"] = float(self.input_ganancia.text())
         except ValueError:
             QMessageBox.warning(self, "Error", "Números inválidos.")
+            return
+
+        self.precio_material = materiales
+        self.configuracion = configuracion
+        data = {"materiales": self.precio_material, "configuracion": self.configuracion}
+        with open(CONFIG_FILE, "w") as f:
+            json.dump(data, f, indent=4)
+        guardar_snapshot(data)
+        QMessageBox.information(self, "Éxito", "Configuración guardada.")
 
     def loadConfig(self):
         if os.path.exists(CONFIG_FILE):
@@ -0,0 +1,178 @@
+import os
+import json
+import hashlib
+import tempfile
+
+from registros import (
+    TablaRegistros, COD_IMPRESION, SIN_MARGEN, TIPOS, _numero, tiempo_a_horas,
+)
+
+# --- CONSTANTES ---
+SNAPSHOTS_DIR = "snapshots_precios"
+
+
+# --- SNAPSHOTS DE LISTAS DE PRECIOS ---
+def _normalizar(valor):
+    # 20000 y 20000.0 son el mismo precio: los números se hashean como float
+    if isinstance(valor, dict):
+        return {k: _normalizar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return valor
+
+def snapshot_id(data):
+    """ID estable de una lista de precios: hash del JSON canónico."""
+    canonico = json.dumps(_normalizar(data), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonico.encode("utf-8")).hexdigest()[:12]
+
+def guardar_snapshot(data):
+    """Guarda la lista de precios (si no existía) y devuelve su ID.
+
+    La escritura es atómica (archivo temporal + os.replace). Si la carpeta no
+    se puede escribir se informa por consola y se devuelve el ID igual.
+    """
+    sid = snapshot_id(data)
+    ruta = os.path.join(SNAPSHOTS_DIR, f"{sid}.json")
+    if os.path.exists(ruta):
+        return sid
+    try:
+        os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=SNAPSHOTS_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp, ruta)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    except OSError as e:
+        print(f"Error guardando lista de precios {sid}: {e}")
+    return sid
+
+def cargar_snapshot(sid):
+    with open(os.path.join(SNAPSHOTS_DIR, f"{sid}.json"), "r") as f:
+        return json.load(f)
+
+def listar_snapshots():
+    if not os.path.isdir(SNAPSHOTS_DIR):
+        return []
+    return sorted(n[:-5] for n in os.listdir(SNAPSHOTS_DIR) if n.endswith(".json"))
+
+
+# --- CÁLCULO ---
+def calcular_impresion(data, material, peso, total_horas, cantidad, hs_diseno, margen_error=10):
+    """Devuelve (costo_mat, costo_luz, costo_maq, unitario, total_lote)."""
+    conf = data["configuracion"]
+    costo_mat = (peso * (1 + margen_error/100) / 1000) * data["materiales"][material]
+    costo_luz = total_horas * conf["consumo_kw"] * conf["precio_kwh"]
+    costo_maq = total_horas * conf["precio_desgaste_hora"]
+
+    subtotal = costo_mat + costo_luz + costo_maq
+    precio_venta = subtotal * (1 + conf["margen_ganancia"]/100)
+    total_lote = precio_venta + hs_diseno * conf["precio_hora_diseno"]
+    return costo_mat, costo_luz, costo_maq, total_lote / cantidad, total_lote
+
+
+# --- RE-COTIZACIÓN DEL HISTORIAL ---
+def _constantes(data):
+    """(precio por gramo de cada material, $ por hora de máquina, $ por hora de diseño).
+
+    Ya incluyen el margen de ganancia; el de fallo depende de cada fila.
+    """
+    conf = data["configuracion"]
+    mult = 1 + conf["margen_ganancia"]/100
+    k_mat = {m: precio / 1000 * mult for m, precio in data["materiales"].items()}
+    k_hora = (conf["consumo_kw"] * conf["precio_kwh"] + conf["precio_desgaste_hora"]) * mult
+    return k_mat, k_hora, conf["precio_hora_diseno"]
+
+def _recotizar(filas, k_hora, k_dis, margen_error):
+    """Fórmula común a ambos caminos.
+
+    `filas` da (k_mat, peso, horas, hs_diseno, cantidad, margen, unitario, total);
+    k_mat None marca las filas que conservan sus valores.
+    """
+    resultados = []
+    for k, peso, horas, hs, cant, margen, unitario, total in filas:
+        if k is None or not cant:
+            resultados.append((unitario, total))
+            continue
+        if margen == SIN_MARGEN:
+            margen = margen_error
+        total = peso * (1 + margen/100) * k + horas * k_hora + hs * k_dis
+        resultados.append((total / cant, total))
+    return resultados
+
+def recotizar_tabla(tabla, data, margen_error=10):
+    """Recalcula (unitario, total) de cada registro de `tabla` con la lista `data`.
+
+    Cada fila usa el margen de fallo con el que se cotizó; `margen_error` solo
+    se usa para filas viejas que no lo guardaron. Las filas que no son de
+    Impresión 3D, o cuyo material no está en la lista nueva, conservan sus
+    valores originales, igual que las de cantidad 0 o ilegible (no hay unitario
+    que calcular). Las constantes de la lista se calculan una sola vez y
+    se recorren las columnas de la tabla en una pasada.
+    """
+    k_mat, k_hora, k_dis = _constantes(data)
+    por_codigo = [k_mat.get(m) for m in tabla.catalogos.material.valores]
+    ks = (
+        por_codigo[mat] if tipo == COD_IMPRESION else None
+        for tipo, mat in zip(tabla.columna("tipo"), tabla.columna("material"))
+    )
+    columnas = zip(
+        ks, tabla.columna("peso"), tabla.horas(),
+        tabla.exactos("hs_diseno"), tabla.exactos("cantidad"), tabla.exactos("margen_error"),
+        tabla.columna("unitario"), tabla.columna("total"),
+    )
+    return _recotizar(columnas, k_hora, k_dis, margen_error)
+
+def _monto(celda):
+    # Como las columnas float de TablaRegistros: lo ilegible cuenta como 0.0
+    n = _numero(celda)
+    return 0.0 if n is None else float(n)
+
+def _leer_filas(filas, k_mat):
+    """Las columnas de `_recotizar` leídas directo del layout de Sheets, sin armar la tabla."""
+    impresion = TIPOS[COD_IMPRESION]
+    horas = {}
+    for f in filas:
+        tiempo = f[9]
+        h = horas.get(tiempo)
+        if h is None:
+            h = horas[tiempo] = tiempo_a_horas(tiempo)
+        margen = _numero(f[15]) if len(f) > 15 else None
+        yield (
+            k_mat.get(str(f[6])) if f[5] == impresion else None,
+            _monto(f[8]), h,
+            _numero(f[11]) or 0, _numero(f[10]) or 0,
+            SIN_MARGEN if margen is None else margen,
+            _monto(f[12]), _monto(f[13]),
+        )
+
+def recotizar(filas, data, margen_error=10):
+    """Como `recotizar_tabla`, para filas con el layout de Google Sheets.
+
+    Lee las celdas en una sola pasada, sin convertirlas a TablaRegistros.
+    """
+    k_mat, k_hora, k_dis = _constantes(data)
+    return _recotizar(_leer_filas(filas, k_mat), k_hora, k_dis, margen_error)
+
+def impacto_recotizacion(historial, data, margen_error=10):
+    """Resumen de facturación del historial: original vs. lista de precios `data`.
+
+    `historial` puede ser una TablaRegistros o una lista de filas de Sheets.
+    """
+    if isinstance(historial, TablaRegistros):
+        nuevos = recotizar_tabla(historial, data, margen_error)
+        anterior = sum(historial.columna("total"))
+    else:
+        nuevos = recotizar(historial, data, margen_error)
+        anterior = sum(_monto(f[13]) for f in historial)
+    nuevo = sum(total for _, total in nuevos)
+    return {
+        "filas": len(historial),
+        "total_anterior": anterior,
+        "total_nuevo": nuevo,
+        "diferencia": nuevo - anterior,
+    }
@@ -0,0 +1,445 @@
+import math
+from array import array
+from itertools import islice
+from datetime import date, datetime, timedelta
+
+# --- CONSTANTES ---
+# Formatos de tiempo de la columna "Tiempo" del layout de Sheets
+FMT_NA = 0     # "N/A" (ventas directas)
+FMT_DHM = 1    # "1d 2h 30m" (cotizador_3d.py)
+FMT_MIN = 2    # "90.0 min" (app.py)
+FMT_HS = 3     # "2.0 hs" (app.py)
+FMT_LIBRE = 4  # Texto que no se reconstruye desde minutos enteros (se guarda aparte)
+
+EPOCH = datetime(2000, 1, 1)
+_EPOCH_ORD = EPOCH.toordinal()
+
+# Valores conocidos de cada catálogo: van primero para que sus códigos sean estables
+TIPOS = ("Impresión 3D", "Venta Directa")
+MATERIALES = ("-", "PLA", "PETG", "ABS", "TPU", "Resina")
+COLORES = ("-", "Negro", "Blanco", "Gris", "Rojo", "Azul", "Naranja", "Verde", "Multicolor")
+RESPONSABLES = ("Nahuel", "Seba", "Otro")
+
+# Códigos enteros de la columna "tipo" (el texto está en TIPOS)
+COD_IMPRESION = TIPOS.index("Impresión 3D")
+COD_VENTA = TIPOS.index("Venta Directa")
+
+# Orden de los campos de un registro y typecode de su columna en TablaRegistros.
+# peso, unitario y total guardan además el float exacto que se subió a Sheets.
+# margen_error (% de fallo de la cotización) vale SIN_MARGEN en filas que no lo tienen.
+CAMPOS = (
+    "timestamp", "responsable", "cliente", "modelo", "tipo", "material", "color",
+    "peso", "minutos", "fmt_tiempo", "cantidad", "hs_diseno",
+    "unitario_cent", "total_cent", "unitario", "total", "snapshot", "margen_error",
+)
+_TYPECODES = ("q", "H", "I", "I", "B", "H", "H", "d", "i", "B", "i", "i", "q", "q", "d", "d", "I", "i")
+SIN_MARGEN = -1
+_CAMPOS_CODIFICADOS = ("responsable", "cliente", "modelo", "tipo", "material", "color", "snapshot")
+
+_MAX_CACHE = 100_000
+_LOTE = 10_000  # filas por lote en TablaRegistros.desde_filas
+
+
+class Catalogo:
+    """Tabla de códigos enteros <-> textos (tipo, material, color, etc.)."""
+    __slots__ = ("valores", "_codigos")
+
+    def __init__(self, valores=()):
+        self.valores = []
+        self._codigos = {}
+        for v in valores:
+            self.codigo(v)
+
+    def codigo(self, valor):
+        cod = self._codigos.get(valor)
+        if cod is None:
+            cod = self._codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return cod
+
+    def __len__(self):
+        return len(self.valores)
+
+
+class Catalogos:
+    """Un catálogo por campo codificado. Cada tabla tiene los suyos."""
+    __slots__ = _CAMPOS_CODIFICADOS
+
+    def __init__(self):
+        self.responsable = Catalogo(RESPONSABLES)
+        self.cliente = Catalogo()
+        self.modelo = Catalogo()
+        self.tipo = Catalogo(TIPOS)
+        self.material = Catalogo(MATERIALES)
+        self.color = Catalogo(COLORES)
+        self.snapshot = Catalogo([""])
+
+
+# --- CONVERSIONES ---
+def _leer_tiempo(texto):
+    """(horas, formato) de un texto de tiempo. Es el único parser de tiempos."""
+    texto = str(texto).strip()
+    if texto in ("N/A", ""):
+        return 0.0, FMT_NA
+
+    partes = texto.split()
+    try:
+        if len(partes) == 2 and partes[1] in ("min", "hs"):
+            valor = float(partes[0].replace(",", "."))
+            if partes[1] == "min":
+                return valor / 60, FMT_MIN
+            return valor, FMT_HS
+
+        minutos = 0
+        factores = {"d": 1440, "h": 60, "m": 1}
+        for p in partes:
+            minutos += int(p[:-1]) * factores[p[-1]]
+        return minutos / 60, FMT_DHM
+    except (ValueError, KeyError, IndexError):
+        return 0.0, FMT_LIBRE
+
+def tiempo_a_horas(texto):
+    """Convierte "1d 2h 30m", "90.0 min" o "2.0 hs" a horas. "N/A" -> 0."""
+    return _leer_tiempo(texto)[0]
+
+def parsear_tiempo(texto):
+    """Devuelve (minutos enteros, formato) para los textos de tiempo de ambas apps."""
+    horas, fmt = _leer_tiempo(texto)
+    return int(horas * 60 + 0.5), fmt
+
+def formatear_tiempo(minutos, fmt):
+    if fmt == FMT_DHM:
+        d, resto = divmod(minutos, 1440)
+        h, m = divmod(resto, 60)
+        return f"{d}d {h}h {m}m"
+    if fmt == FMT_MIN:
+        return f"{float(minutos)} min"
+    if fmt == FMT_HS:
+        return f"{minutos / 60} hs"
+    return "N/A"
+
+def formato_pesos(cent):
+    """Formatea centavos como "$1234.56" sin pasar por float."""
+    signo = "-" if cent < 0 else ""
+    pesos, cs = divmod(abs(cent), 100)
+    return f"{signo}${pesos}.{cs:02d}"
+
+def _numero(celda):
+    """Número de una celda de Sheets, o None si está vacía o no es numérica."""
+    if type(celda) is int or type(celda) is float:
+        return celda if math.isfinite(celda) else None
+    if type(celda) is not str:
+        return None
+    try:
+        n = float(celda.replace(",", "."))
+    except ValueError:
+        return None
+    return n if math.isfinite(n) else None
+
+# Fechas, horas y tiempos se repiten mucho en el historial: se parsean una vez.
+# Los cachés se vacían al llegar al límite para no crecer sin control.
+_cache_fecha = {}
+_cache_hora = {}
+_cache_dia = {}
+_cache_tiempo = {}
+
+def _cacheado(cache, clave, funcion):
+    res = cache.get(clave)
+    if res is None:
+        if len(cache) >= _MAX_CACHE:
+            cache.clear()
+        res = cache[clave] = funcion(clave)
+    return res
+
+def _leer_fecha(fecha):
+    """(días desde EPOCH, se_reconstruye) de "19/10/2026" o "2026-10-19"."""
+    try:
+        if "-" in fecha:
+            a, m, d = fecha.split("-")
+        else:
+            d, m, a = fecha.split("/")
+        dia = date(int(a), int(m), int(d))
+    except ValueError:
+        return 0, False
+    return dia.toordinal() - _EPOCH_ORD, dia.strftime("%d/%m/%Y") == fecha
+
+def _leer_hora(hora):
+    """(segundos del día, se_reconstruye) de "14:05:09"."""
+    try:
+        h, m, s = (int(x) for x in hora.split(":"))
+    except ValueError:
+        return 0, False
+    exacto = 0 <= h < 24 and 0 <= m < 60 and 0 <= s < 60 and f"{h:02d}:{m:02d}:{s:02d}" == hora
+    return h * 3600 + m * 60 + s, exacto
+
+def _segundos(fecha, hora):
+    """(timestamp, se_reconstruye). Lo que no se entiende cuenta como 0."""
+    dias, fecha_ok = _cacheado(_cache_fecha, fecha, _leer_fecha) if type(fecha) is str else (0, False)
+    seg, hora_ok = _cacheado(_cache_hora, hora, _leer_hora) if type(hora) is str else (0, False)
+    return dias * 86400 + seg, fecha_ok and hora_ok
+
+def _texto_dia(dias):
+    return date.fromordinal(dias + _EPOCH_ORD).strftime("%d/%m/%Y")
+
+def _fecha_hora(ts):
+    dias, seg = divmod(ts, 86400)
+    fecha = _cacheado(_cache_dia, dias, _texto_dia)
+    h, resto = divmod(seg, 3600)
+    m, s = divmod(resto, 60)
+    return fecha, f"{h:02d}:{m:02d}:{s:02d}"
+
+def _tiempo(texto):
+    """(minutos, formato, se_reconstruye) de la columna Tiempo, con caché."""
+    return _cacheado(_cache_tiempo, texto, _leer_columna_tiempo)
+
+def _leer_columna_tiempo(texto):
+    minutos, fmt = parsear_tiempo(texto)
+    return minutos, fmt, formatear_tiempo(minutos, fmt) == texto
+
+def _flotante(celda, c, originales):
+    if type(celda) is float and math.isfinite(celda):
+        return celda
+    originales[c] = celda
+    n = _numero(celda)
+    return 0.0 if n is None else float(n)
+
+def _entero(celda, c, originales):
+    if type(celda) is int:
+        return celda
+    originales[c] = celda
+    n = _numero(celda)
+    return 0 if n is None else int(round(n))
+
+def _parsear_fila(fila, cat):
+    """Fila del layout de Sheets -> (valores, originales).
+
+    `originales` guarda {columna: celda} de las celdas que los campos tipados no
+    reconstruyen igual, con su valor y su tipo: textos de tiempo raros, fechas
+    en otro formato, celdas vacías o no numéricas (el campo tipado queda en 0),
+    enteros en columnas float y viceversa... None si no hay ninguna. Así la
+    conversión de ida y vuelta no pierde nada.
+    """
+    originales = {}
+
+    fecha, hora = fila[0], fila[1]
+    timestamp, exacto = _segundos(fecha, hora)
+    if not exacto:
+        originales[0], originales[1] = fecha, hora
+
+    textos = fila[2:8]
+    if {*map(type, textos)} != {str}:
+        for c, v in enumerate(textos, 2):
+            if type(v) is not str:
+                originales[c] = v
+        textos = [str(v) for v in textos]
+
+    peso = _flotante(fila[8], 8, originales)
+    unitario = _flotante(fila[12], 12, originales)
+    total = _flotante(fila[13], 13, originales)
+
+    minutos, fmt, exacto = _tiempo(str(fila[9]))
+    if not exacto or type(fila[9]) is not str:
+        originales[9] = fila[9]
+        fmt = FMT_LIBRE
+
+    snapshot = ""
+    margen = SIN_MARGEN
+    if len(fila) > 14:
+        snapshot = fila[14]
+        if type(snapshot) is not str or snapshot == "":
+            originales[14] = snapshot
+    if len(fila) > 15:
+        margen = fila[15]
+        if type(margen) is not int:
+            originales[15] = margen
+            n = _numero(margen)
+            margen = SIN_MARGEN if n is None else int(round(n))
+        if len(fila) > 16:
+            originales[16] = list(fila[16:])
+
+    valores = (
+        timestamp,
+        cat.responsable.codigo(textos[0]),
+        cat.cliente.codigo(textos[1]),
+        cat.modelo.codigo(textos[2]),
+        cat.tipo.codigo(textos[3]),
+        cat.material.codigo(textos[4]),
+        cat.color.codigo(textos[5]),
+        peso,
+        minutos,
+        fmt,
+        _entero(fila[10], 10, originales),
+        _entero(fila[11], 11, originales),
+        round(unitario * 100),
+        round(total * 100),
+        unitario,
+        total,
+        cat.snapshot.codigo(str(snapshot)),
+        margen,
+    )
+    return valores, originales or None
+
+def _armar_fila(v, originales, cat):
+    fecha, hora = _fecha_hora(v[0])
+    fila = [
+        fecha, hora,
+        cat.responsable.valores[v[1]],
+        cat.cliente.valores[v[2]],
+        cat.modelo.valores[v[3]],
+        cat.tipo.valores[v[4]],
+        cat.material.valores[v[5]],
+        cat.color.valores[v[6]],
+        v[7],
+        formatear_tiempo(v[8], v[9]),
+        v[10], v[11],
+        v[14],
+        v[15],
+    ]
+    originales = originales or {}
+    for c, celda in originales.items():
+        if c < 14:
+            fila[c] = celda
+
+    # Columnas opcionales: 14 snapshot, 15 margen de fallo, 16+ columnas extra
+    con_margen = v[17] != SIN_MARGEN or 15 in originales
+    if con_margen or v[16] or 14 in originales:
+        fila.append(originales[14] if 14 in originales else cat.snapshot.valores[v[16]])
+    if con_margen:
+        fila.append(originales[15] if 15 in originales else v[17])
+    fila.extend(originales.get(16, ()))
+    return fila
+
+
+# --- REGISTRO ---
+class Registro:
+    """Un registro tipado: timestamp, minutos y centavos enteros, textos como códigos."""
+    __slots__ = CAMPOS + ("originales", "catalogos")
+
+    def __init__(self, *valores, originales=None, catalogos=None):
+        for campo, v in zip(CAMPOS, valores):
+            setattr(self, campo, v)
+        self.originales = originales
+        self.catalogos = catalogos if catalogos is not None else Catalogos()
+
+    @classmethod
+    def desde_fila(cls, fila, catalogos=None):
+        catalogos = catalogos if catalogos is not None else Catalogos()
+        valores, originales = _parsear_fila(fila, catalogos)
+        return cls(*valores, originales=originales, catalogos=catalogos)
+
+    def valores(self):
+        return tuple(getattr(self, campo) for campo in CAMPOS)
+
+    def a_fila(self):
+        return _armar_fila(self.valores(), self.originales, self.catalogos)
+
+    @property
+    def momento(self):
+        return EPOCH + timedelta(seconds=self.timestamp)
+
+
+# --- TABLA ---
+class TablaRegistros:
+    """Registros guardados por columnas en arrays (un número por campo y fila).
+
+    Cada tabla tiene sus propios catálogos, así que los clientes o modelos de
+    una sesión no se mezclan con los de otra y se liberan junto con la tabla.
+    """
+
+    def __init__(self):
+        self.catalogos = Catalogos()
+        self._columnas = tuple(array(tc) for tc in _TYPECODES)
+        # Celdas que no salen de los campos tipados: {indice_fila: {columna: celda}}
+        self._originales = {}
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """Carga masiva: parsea por lotes y extiende cada columna de una vez."""
+        tabla = cls()
+        cat, originales, columnas = tabla.catalogos, tabla._originales, tabla._columnas
+        filas = iter(filas)
+        while True:
+            lote = []
+            inicio = len(tabla)
+            for i, fila in enumerate(islice(filas, _LOTE), inicio):
+                valores, orig = _parsear_fila(fila, cat)
+                if orig is not None:
+                    originales[i] = orig
+                lote.append(valores)
+            if not lote:
+                return tabla
+            for col, valores_col in zip(columnas, zip(*lote)):
+                col.extend(valores_col)
+
+    def __len__(self):
+        return len(self._columnas[0])
+
+    def columna(self, campo):
+        return self._columnas[CAMPOS.index(campo)]
+
+    def agregar(self, registro):
+        return self.agregar_fila(registro.a_fila())
+
+    def agregar_fila(self, fila):
+        valores, originales = _parsear_fila(fila, self.catalogos)
+        if originales is not None:
+            self._originales[len(self)] = originales
+        for col, v in zip(self._columnas, valores):
+            col.append(v)
+        return Registro(*valores, originales=originales, catalogos=self.catalogos)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        valores = [col[i] for col in self._columnas]
+        return Registro(*valores, originales=self._originales.get(i), catalogos=self.catalogos)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def a_filas(self):
+        originales, cat = self._originales, self.catalogos
+        return [_armar_fila(v, originales.get(i), cat) for i, v in enumerate(zip(*self._columnas))]
+
+    # --- VALORES EXACTOS ---
+    def exactos(self, campo):
+        """Valores numéricos tal como se subieron, incluidas las celdas guardadas aparte."""
+        col = self.columna(campo)
+        c = {"cantidad": 10, "hs_diseno": 11, "margen_error": 15}.get(campo)
+        if c is None or not self._originales:
+            yield from col
+            return
+        originales = self._originales
+        for i, v in enumerate(col):
+            o = originales.get(i)
+            n = _numero(o[c]) if o is not None and c in o else None
+            yield v if n is None else n
+
+    def horas(self):
+        """Tiempo de impresión de cada fila en horas, con el mismo parser que los textos."""
+        originales = self._originales
+        for i, (minutos, fmt) in enumerate(zip(self.columna("minutos"), self.columna("fmt_tiempo"))):
+            # Fuera de FMT_LIBRE el texto se reconstruye exacto desde los minutos
+            yield tiempo_a_horas(originales[i][9]) if fmt == FMT_LIBRE else minutos / 60
+
+    # --- AGREGACIONES ---
+    def total_cent(self, tipo=None):
+        totales = self.columna("total_cent")
+        if tipo is None:
+            return sum(totales)
+        return sum(t for c, t in zip(self.columna("tipo"), totales) if c == tipo)
+
+    def minutos_totales(self, tipo=None):
+        minutos = self.columna("minutos")
+        if tipo is None:
+            return sum(minutos)
+        return sum(m for c, m in zip(self.columna("tipo"), minutos) if c == tipo)
+
+    def total_por(self, campo):
+        """Suma de centavos agrupada por un campo codificado: {texto: centavos}."""
+        catalogo = getattr(self.catalogos, campo)
+        acumulado = [0] * len(catalogo)
+        for cod, total in zip(self.columna(campo), self.columna("total_cent")):
+            acumulado[cod] += total
+        return {catalogo.valores[cod]: t for cod, t in enumerate(acumulado) if t}
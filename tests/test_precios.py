@@ -0,0 +1,139 @@
+import json
+import os
+
+import pytest
+
+import precios
+from precios import (
+    calcular_impresion, impacto_recotizacion, recotizar, recotizar_tabla,
+    snapshot_id, guardar_snapshot, cargar_snapshot, listar_snapshots,
+)
+from registros import TablaRegistros, tiempo_a_horas
+
+LISTA_VIEJA = {
+    "materiales": {"PLA": 20000, "PETG": 16450},
+    "configuracion": {
+        "precio_kwh": 170, "consumo_kw": 0.2, "precio_hora_diseno": 8500,
+        "margen_ganancia": 100, "precio_desgaste_hora": 200,
+    },
+}
+LISTA_NUEVA = {
+    "materiales": {"PLA": 23000.0},  # sin PETG
+    "configuracion": {
+        "precio_kwh": 250.0, "consumo_kw": 0.3, "precio_hora_diseno": 9000.0,
+        "margen_ganancia": 80.0, "precio_desgaste_hora": 220.0,
+    },
+}
+
+
+def _fila_impresion(material, peso, tiempo, cant, hs_dis, margen=None):
+    _, _, _, unitario, total = calcular_impresion(
+        LISTA_VIEJA, material, peso, tiempo_a_horas(tiempo), cant, hs_dis,
+        10 if margen is None else margen,
+    )
+    fila = ["19/10/2026", "14:00:00", "Nahuel", "Juan", "Pieza", "Impresión 3D", material, "Negro",
+            peso, tiempo, cant, hs_dis, unitario, total, snapshot_id(LISTA_VIEJA)]
+    if margen is not None:
+        fila.append(margen)
+    return fila
+
+
+FILAS = [
+    _fila_impresion("PLA", 12.345, "1d 2h 30m", 3, 1),   # cotizador_3d.py
+    _fila_impresion("PLA", 100.0, "90.5 min", 1, 0),     # app.py, minutos
+    _fila_impresion("PLA", 55.5, "1.33 hs", 2, 0),       # app.py, horas
+    _fila_impresion("PETG", 40.0, "2.0 hs", 1, 0),       # material ausente en la lista nueva
+    ["19/10/2026", "15:00:00", "Seba", "Kiosco", "Llavero", "Venta Directa", "-", "-",
+     0, "N/A", 10, 0, 5.0, 50.0, snapshot_id(LISTA_VIEJA)],
+    _fila_impresion("PLA", 30.0, "45.0 min", 2, 0, margen=25),  # margen de fallo distinto de 10
+]
+
+
+def _margen(fila):
+    return fila[15] if len(fila) > 15 else 10
+
+
+def test_recotizar_con_la_misma_lista_no_cambia_nada():
+    for (unitario, total), fila in zip(recotizar(FILAS, LISTA_VIEJA), FILAS):
+        assert unitario == pytest.approx(fila[12])
+        assert total == pytest.approx(fila[13])
+
+
+@pytest.mark.parametrize("i", [0, 1, 2, 5])
+def test_recotizar_formatos_de_tiempo(i):
+    fila = FILAS[i]
+    esperado = calcular_impresion(
+        LISTA_NUEVA, fila[6], fila[8], tiempo_a_horas(fila[9]), fila[10], fila[11], _margen(fila)
+    )
+    unitario, total = recotizar(FILAS, LISTA_NUEVA)[i]
+    assert unitario == pytest.approx(esperado[3])
+    assert total == pytest.approx(esperado[4])
+
+
+def test_material_ausente_y_ventas_quedan_igual():
+    resultados = recotizar(FILAS, LISTA_NUEVA)
+    assert resultados[3] == (FILAS[3][12], FILAS[3][13])
+    assert resultados[4] == (5.0, 50.0)
+
+
+@pytest.mark.parametrize("cant", [0, "0", ""])
+def test_cantidad_cero_queda_igual(cant):
+    fila = FILAS[0][:10] + [cant] + FILAS[0][11:]
+    assert recotizar([fila], LISTA_NUEVA) == [(fila[12], fila[13])]
+    assert impacto_recotizacion([fila], LISTA_NUEVA)["diferencia"] == 0
+
+
+def test_tabla_y_filas_dan_lo_mismo():
+    atipicas = [
+        ["Fecha", "Hora", "Resp.", "Cliente", "Modelo", "Tipo", "Mat", "Color", "Peso", "Tiempo",
+         "Cant", "Hs Dis", "Unitario", "Total", "Lista", "Fallo %"],
+        # Como las devuelve get_all_values: todo texto, margen vacío
+        ["19/10/2026", "14:00:00", "Seba", "Ana", "X", "Impresión 3D", "PLA", "Negro",
+         "12,5", "90.5 min", "2", "0,5", "100", "200", "", ""],
+        ["19/10/2026", "14:00:00", "Seba", "Ana", "X", "Impresión 3D", "PLA", "Negro",
+         10, "mucho", 1, 0, 1, 1, "abc", "15"],
+    ]
+    filas = FILAS + atipicas
+    tabla = TablaRegistros.desde_filas(filas)
+    assert recotizar_tabla(tabla, LISTA_NUEVA) == recotizar(filas, LISTA_NUEVA)
+    assert impacto_recotizacion(tabla, LISTA_NUEVA) == impacto_recotizacion(filas, LISTA_NUEVA)
+
+
+def test_impacto_contra_calcular_impresion():
+    esperado = 0.0
+    for f in FILAS:
+        if f[5] == "Impresión 3D" and f[6] in LISTA_NUEVA["materiales"]:
+            esperado += calcular_impresion(
+                LISTA_NUEVA, f[6], f[8], tiempo_a_horas(f[9]), f[10], f[11], _margen(f)
+            )[4]
+        else:
+            esperado += f[13]
+
+    impacto = impacto_recotizacion(FILAS, LISTA_NUEVA)
+    assert impacto["filas"] == len(FILAS)
+    assert impacto["total_anterior"] == pytest.approx(sum(f[13] for f in FILAS))
+    assert impacto["total_nuevo"] == pytest.approx(esperado)
+    assert impacto["diferencia"] == pytest.approx(esperado - impacto["total_anterior"])
+
+
+def test_margen_guardado_tiene_prioridad():
+    # El margen del registro gana al del parámetro; el parámetro solo cubre filas viejas
+    impacto = impacto_recotizacion(FILAS[5:], LISTA_VIEJA, margen_error=50)
+    assert impacto["diferencia"] == pytest.approx(0)
+    viejas = impacto_recotizacion(FILAS[:1], LISTA_VIEJA, margen_error=50)
+    assert viejas["diferencia"] > 0
+
+
+def test_snapshot_id_ignora_int_vs_float():
+    como_float = json.loads(json.dumps(LISTA_VIEJA), parse_int=float)
+    assert snapshot_id(como_float) == snapshot_id(LISTA_VIEJA)
+    assert snapshot_id(LISTA_NUEVA) != snapshot_id(LISTA_VIEJA)
+
+
+def test_guardar_y_cargar_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(precios, "SNAPSHOTS_DIR", str(tmp_path / "snapshots"))
+    sid = guardar_snapshot(LISTA_VIEJA)
+    assert guardar_snapshot(LISTA_VIEJA) == sid
+    assert cargar_snapshot(sid) == LISTA_VIEJA
+    assert listar_snapshots() == [sid]
+    assert os.listdir(tmp_path / "snapshots") == [f"{sid}.json"]
@@ -0,0 +1,139 @@
+import pytest
+
+from registros import (
+    Registro, TablaRegistros, COD_IMPRESION, COD_VENTA,
+    FMT_DHM, FMT_HS, FMT_LIBRE, FMT_MIN, FMT_NA,
+    SIN_MARGEN, formato_pesos, parsear_tiempo, tiempo_a_horas,
+)
+
+FILAS = [
+    # cotizador_3d.py: peso con 3 decimales, montos sin redondear, hs de diseño fraccionarias
+    ["19/10/2026", "14:05:09", "Nahuel", "Juan", "Pieza", "Impresión 3D", "PLA", "Negro",
+     12.345, "1d 2h 30m", 3, 1.5, 370.370367, 1111.111101, "d4fdc7a83e96"],
+    # app.py: tiempos en minutos y horas
+    ["01/02/2025", "00:00:00", "Seba", "Ana", "Llavero", "Impresión 3D", "PETG", "Lila",
+     100.0, "90.5 min", 1, 0, 123.456789, 123.456789, "d4fdc7a83e96"],
+    ["01/02/2025", "23:59:59", "Otro", "Ana", "X", "Impresión 3D", "ABS", "Rojo",
+     7.0, "1.33 hs", 2, 0, 10.5, 21.0],
+    ["01/02/2025", "23:59:59", "Otro", "Ana", "X", "Impresión 3D", "ABS", "Rojo",
+     7.0, "2.0 hs", 2, 0, 10.5, 21.0],
+    # Venta directa, layout viejo de 14 columnas
+    ["03/03/2024", "10:00:00", "Nahuel", "Kiosco", "Llavero", "Venta Directa", "-", "-",
+     0, "N/A", 10, 0, 5.0, 50.0],
+]
+
+
+def _assert_identicas(obtenidas, esperadas):
+    # Mismo valor y mismo tipo en cada celda: 0 y 0.0 no son lo mismo
+    assert [[(type(c), c) for c in f] for f in obtenidas] == [[(type(c), c) for c in f] for f in esperadas]
+
+
+def test_ida_y_vuelta_sin_perdidas():
+    tabla = TablaRegistros.desde_filas(FILAS)
+    _assert_identicas(tabla.a_filas(), FILAS)
+    _assert_identicas([r.a_fila() for r in tabla], FILAS)
+
+
+def test_ida_y_vuelta_tipos_enteros():
+    # Venta directa con montos enteros, como los deja Sheets
+    fila = ["03/03/2024", "10:00:00", "Nahuel", "Kiosco", "Llavero", "Venta Directa", "-", "-",
+            0, "N/A", 10, 0, 5, 50]
+    _assert_identicas(TablaRegistros.desde_filas([fila]).a_filas(), [fila])
+
+
+def test_ida_y_vuelta_celdas_atipicas():
+    filas = [
+        # Celdas como texto (get_all_values), fecha sin ceros, cliente numérico
+        ["1/2/2025", "9:5:3", "Seba", 1234, "X", "Venta Directa", "-", "-",
+         "12,5", "N/A", "2", "0", "5", "10"],
+        # Snapshot vacío, columnas extra, tiempo vacío y cantidad con decimales
+        ["01/02/2025", "10:00:00", "Otro", "Ana", "X", "Impresión 3D", "PLA", "Negro",
+         1.0, "", 2.5, 0, 5.0, 10.0, "", "nota"],
+    ]
+    _assert_identicas(TablaRegistros.desde_filas(filas).a_filas(), filas)
+
+
+def test_margen_de_fallo():
+    filas = [
+        FILAS[0] + [15],
+        FILAS[2] + ["", 12.5],  # sin snapshot, margen fraccionario
+        FILAS[4] + ["d4fdc7a83e96", 0],
+    ]
+    tabla = TablaRegistros.desde_filas(filas)
+    _assert_identicas(tabla.a_filas(), filas)
+    assert list(tabla.exactos("margen_error")) == [15, 12.5, 0]
+    assert tabla[0].margen_error == 15
+    assert TablaRegistros.desde_filas(FILAS).columna("margen_error")[0] == SIN_MARGEN
+
+
+def test_hoja_completa_con_encabezado_y_celdas_vacias():
+    # Lo que devuelve sheet.get_all_values(): encabezado y todo como texto
+    hoja = [
+        ["Fecha", "Hora", "Resp.", "Cliente", "Modelo", "Tipo", "Mat", "Color",
+         "Peso", "Tiempo", "Cant", "Hs Dis", "Unitario", "Total"],
+        ["19/10/2026", "14:05:09", "Nahuel", "Juan", "Pieza", "Impresión 3D", "PLA", "Negro",
+         "", "", "", "", "", ""],
+        ["2026-10-19", "14:05", "Seba", "Ana", "X", "Venta Directa", "-", "-",
+         "0", "N/A", "abc", "0", "5", "50"],
+    ]
+    tabla = TablaRegistros.desde_filas(hoja)
+    _assert_identicas(tabla.a_filas(), hoja)
+
+    # Las celdas que no se entienden quedan en 0 en los campos tipados
+    assert tabla[0].cantidad == 0 and tabla[0].total_cent == 0
+    assert tabla[1].peso == 0.0 and tabla[1].unitario == 0.0
+    assert tabla[2].cantidad == 0 and tabla[2].total_cent == 5000
+    assert list(tabla.exactos("cantidad")) == [0, 0, 0]
+
+
+def test_fecha_iso():
+    fila = list(FILAS[0])
+    fila[0] = "2026-10-19"
+    reg = Registro.desde_fila(fila)
+    assert reg.momento.isoformat() == "2026-10-19T14:05:09"
+    _assert_identicas([reg.a_fila()], [fila])
+
+
+def test_campos_tipados():
+    reg = Registro.desde_fila(FILAS[0])
+    assert reg.momento.isoformat() == "2026-10-19T14:05:09"
+    assert reg.tipo == COD_IMPRESION
+    assert reg.minutos == 1590 and reg.fmt_tiempo == FMT_DHM
+    assert reg.unitario_cent == 37037 and reg.total_cent == 111111
+    assert reg.peso == 12.345
+    assert Registro.desde_fila(FILAS[4]).tipo == COD_VENTA
+
+
+@pytest.mark.parametrize("texto, minutos, fmt", [
+    ("1d 2h 30m", 1590, FMT_DHM),
+    ("90.0 min", 90, FMT_MIN),
+    ("2.0 hs", 120, FMT_HS),
+    ("N/A", 0, FMT_NA),
+    ("", 0, FMT_NA),
+    ("mucho", 0, FMT_LIBRE),
+])
+def test_parsear_tiempo(texto, minutos, fmt):
+    assert parsear_tiempo(texto) == (minutos, fmt)
+
+
+def test_horas_de_la_tabla_coinciden_con_el_texto():
+    tabla = TablaRegistros.desde_filas(FILAS)
+    assert list(tabla.horas()) == [tiempo_a_horas(f[9]) for f in FILAS]
+
+
+def test_agregaciones():
+    tabla = TablaRegistros.desde_filas(FILAS)
+    assert tabla.total_cent() == 111111 + 12346 + 2100 + 2100 + 5000
+    assert tabla.total_cent(COD_VENTA) == 5000
+    assert tabla.minutos_totales(COD_VENTA) == 0
+    assert tabla.total_por("material")["ABS"] == 4200
+    assert formato_pesos(tabla[0].total_cent) == "$1111.11"
+    assert formato_pesos(-5) == "-$0.05"
+
+
+def test_catalogos_por_tabla():
+    a = TablaRegistros.desde_filas(FILAS[:1])
+    b = TablaRegistros.desde_filas(FILAS[2:3])
+    assert a[0].cliente == b[0].cliente == 0
+    assert a.a_filas()[0][3] == "Juan" and b.a_filas()[0][3] == "Ana"
+